@@ -159,6 +159,9 @@ def glSetOptions(prefix, opts):
     set_if_set('stipple', lambda v: glEnableStipple(v))
 
 
+mirror_view_ids = {'Edge': 1, 'Face': 2}
+
+
 def glSetMirror(symmetry=None, view=None, effect=0.0, frame: Frame=None):
     mirroring = (0, 0, 0)
     if symmetry and frame:
@@ -170,7 +173,7 @@ def glSetMirror(symmetry=None, view=None, effect=0.0, frame: Frame=None):
         bmeshShader.assign('mirror_x', frame.x)
         bmeshShader.assign('mirror_y', frame.y)
         bmeshShader.assign('mirror_z', frame.z)
-    bmeshShader.assign('mirror_view', {'Edge': 1, 'Face': 2}.get(view, 0))
+    bmeshShader.assign('mirror_view', mirror_view_ids.get(view, 0))
     bmeshShader.assign('mirror_effect', effect)
     bmeshShader.assign('mirroring', mirroring)
 
@@ -212,10 +215,11 @@ def glDrawBMFaces(lbmf, opts=None, enableShader=True):
 
     @profiler.profile
     def render_general(sx, sy, sz):
-        bmeshShader.assign('vert_scale', (sx, sy, sz))
-        bmeshShader.assign('selected', 0.0)
+        assign = bmeshShader.assign
+        assign('vert_scale', (sx, sy, sz))
+        assign('selected', 0.0)
         for bmf in lbmf:
-            bmeshShader.assign('selected', 1.0 if bmf.select else 0.0)
+            assign('selected', 1.0 if bmf.select else 0.0)
             if bmf.smooth:
                 for v0, v1, v2 in triangulateFace(bmf.verts):
                     if v0 not in vdict:
@@ -226,15 +230,15 @@ def glDrawBMFaces(lbmf, opts=None, enableShader=True):
                         vdict[v2] = (v2.co, v2.normal)
                     (c0, n0), (c1, n1), (c2,
                                          n2) = vdict[v0], vdict[v1], vdict[v2]
-                    bmeshShader.assign('vert_norm', n0)
-                    bmeshShader.assign('vert_pos',  c0)
-                    bmeshShader.assign('vert_norm', n1)
-                    bmeshShader.assign('vert_pos',  c1)
-                    bmeshShader.assign('vert_norm', n2)
-                    bmeshShader.assign('vert_pos',  c2)
+                    assign('vert_norm', n0)
+                    assign('vert_pos',  c0)
+                    assign('vert_norm', n1)
+                    assign('vert_pos',  c1)
+                    assign('vert_norm', n2)
+                    assign('vert_pos',  c2)
             else:
                 bgl.glNormal3f(*bmf.normal)
-                bmeshShader.assign('vert_norm', bmf.normal)
+                assign('vert_norm', bmf.normal)
                 for v0, v1, v2 in triangulateFace(bmf.verts):
                     if v0 not in vdict:
                         vdict[v0] = (v0.co, v0.normal)
@@ -244,18 +248,19 @@ def glDrawBMFaces(lbmf, opts=None, enableShader=True):
                         vdict[v2] = (v2.co, v2.normal)
                     (c0, n0), (c1, n1), (c2,
                                          n2) = vdict[v0], vdict[v1], vdict[v2]
-                    bmeshShader.assign('vert_pos', c0)
-                    bmeshShader.assign('vert_pos', c1)
-                    bmeshShader.assign('vert_pos', c2)
+                    assign('vert_pos', c0)
+                    assign('vert_pos', c1)
+                    assign('vert_pos', c2)
 
     @profiler.profile
     def render_triangles(sx, sy, sz):
         # optimized for triangle-only meshes
         # (source meshes that have been triangulated)
-        bmeshShader.assign('vert_scale', (sx, sy, sz))
-        bmeshShader.assign('selected', 0.0)
+        assign = bmeshShader.assign
+        assign('vert_scale', (sx, sy, sz))
+        assign('selected', 0.0)
         for bmf in lbmf:
-            bmeshShader.assign('selected', 1.0 if bmf.select else 0.0)
+            assign('selected', 1.0 if bmf.select else 0.0)
             if bmf.smooth:
                 v0, v1, v2 = bmf.verts
                 if v0 not in vdict:
@@ -265,16 +270,16 @@ def glDrawBMFaces(lbmf, opts=None, enableShader=True):
                 if v2 not in vdict:
                     vdict[v2] = (v2.co, v2.normal)
                 (c0, n0), (c1, n1), (c2, n2) = vdict[v0], vdict[v1], vdict[v2]
-                bmeshShader.assign('vert_norm', n0)
-                bmeshShader.assign('vert_pos',  c0)
+                assign('vert_norm', n0)
+                assign('vert_pos',  c0)
                 # bgl.glNormal3f(*n0)
                 # bgl.glVertex3f(*c0)
-                bmeshShader.assign('vert_norm', n1)
-                bmeshShader.assign('vert_pos',  c1)
+                assign('vert_norm', n1)
+                assign('vert_pos',  c1)
                 # bgl.glNormal3f(*n1)
                 # bgl.glVertex3f(*c1)
-                bmeshShader.assign('vert_norm', n2)
-                bmeshShader.assign('vert_pos',  c2)
+                assign('vert_norm', n2)
+                assign('vert_pos',  c2)
                 # bgl.glNormal3f(*n2)
                 # bgl.glVertex3f(*c2)
             else:
@@ -287,11 +292,11 @@ def glDrawBMFaces(lbmf, opts=None, enableShader=True):
                 if v2 not in vdict:
                     vdict[v2] = (v2.co, v2.normal)
                 (c0, n0), (c1, n1), (c2, n2) = vdict[v0], vdict[v1], vdict[v2]
-                bmeshShader.assign('vert_pos',  c0)
+                assign('vert_pos',  c0)
                 # bgl.glVertex3f(*c0)
-                bmeshShader.assign('vert_pos',  c1)
+                assign('vert_pos',  c1)
                 # bgl.glVertex3f(*c1)
-                bmeshShader.assign('vert_pos',  c2)
+                assign('vert_pos',  c2)
                 # bgl.glVertex3f(*c2)
 
     render = render_triangles if opts_.get(
@@ -619,9 +624,10 @@ def glDrawBMEdges(lbme, opts=None, enableShader=True):
 
     @profiler.profile
     def render(sx, sy, sz):
-        bmeshShader.assign('vert_scale', (sx, sy, sz))
+        assign = bmeshShader.assign
+        assign('vert_scale', (sx, sy, sz))
         for bme in lbme:
-            bmeshShader.assign('selected', 1.0 if bme.select else 0.0)
+            assign('selected', 1.0 if bme.select else 0.0)
             v0, v1 = bme.verts
             if v0 not in vdict:
                 vdict[v0] = (v0.co, v0.normal)
@@ -629,11 +635,11 @@ def glDrawBMEdges(lbme, opts=None, enableShader=True):
                 vdict[v1] = (v1.co, v1.normal)
             (c0, n0), (c1, n1) = vdict[v0], vdict[v1]
             c0, c1 = c0+n0*dn, c1+n1*dn
-            bmeshShader.assign('vert_norm', n0)
-            bmeshShader.assign('vert_pos',  c0)
+            assign('vert_norm', n0)
+            assign('vert_pos',  c0)
             # bgl.glVertex3f(0,0,0)
-            bmeshShader.assign('vert_norm', n1)
-            bmeshShader.assign('vert_pos',  c1)
+            assign('vert_norm', n1)
+            assign('vert_pos',  c1)
             # bgl.glVertex3f(0,0,0)
 
     if enableShader:
@@ -695,15 +701,16 @@ def glDrawBMVerts(lbmv, opts=None, enableShader=True):
 
     @profiler.profile
     def render(sx, sy, sz):
-        bmeshShader.assign('vert_scale', Vector((sx, sy, sz)))
+        assign = bmeshShader.assign
+        assign('vert_scale', Vector((sx, sy, sz)))
         for bmv in lbmv:
-            bmeshShader.assign('selected', 1.0 if bmv.select else 0.0)
+            assign('selected', 1.0 if bmv.select else 0.0)
             if bmv not in vdict:
                 vdict[bmv] = (bmv.co, bmv.normal)
             c, n = vdict[bmv]
             c = c + dn * n
-            bmeshShader.assign('vert_norm', n)
-            bmeshShader.assign('vert_pos',  c)
+            assign('vert_norm', n)
+            assign('vert_pos',  c)
             # bgl.glNormal3f(*n)
             # bgl.glVertex3f(*c)
 
@@ -782,6 +789,10 @@ class BMeshRender():
         # make not dirty first in case bad things happen while drawing
         self.is_dirty = False
 
+        # every uniform must be recorded into the list, so drop any cache left live
+        # by an enable() whose disable() was skipped by an exception
+        bmeshShader.uniform_cache = None
+
         bgl.glNewList(self.calllist, bgl.GL_COMPILE)
         # do not change attribs if they're not set
         glSetDefaultOptions(opts=opts)
@@ -107,6 +107,8 @@ class Profiler:
 
         def done(self): pass
 
+    _ignore = ProfilerHelper_Ignore()
+
     def __init__(self):
         self.clear()
 
@@ -134,9 +136,9 @@ class Profiler:
         # assert not Profiler._broken
         if Profiler._broken:
             print('Profiler broken. Ignoring')
-            return self.ProfilerHelper_Ignore()
+            return self._ignore
         if not Profiler._enabled:
-            return self.ProfilerHelper_Ignore()
+            return self._ignore
 
         frame = inspect.currentframe().f_back
         filename = os.path.basename(frame.f_code.co_filename)
@@ -45,6 +45,20 @@ vbv_zero = VoidBufValue(0)
 buf_zero = vbv_zero.buf    #bgl.Buffer(bgl.GL_BYTE, 1, [0])
 
 
+class ShaderVar:
+    '''
+    location and setter of a single shader variable, resolved once at link time
+    '''
+    __slots__ = ('qualifier', 'type', 'location', 'reported', 'setter')
+
+    def __init__(self, qualifier, type, location, setter):
+        self.qualifier = qualifier
+        self.type = type
+        self.location = location
+        self.reported = False
+        self.setter = setter
+
+
 class Shader():
     @staticmethod
     def shader_compile(name, shader):
@@ -82,7 +96,9 @@ class Shader():
         vertSource, fragSource = [],[]
         vertVersion, fragVersion = '', ''
         mode = None
-        for line in open(filename,'rt').read().splitlines():
+        with open(filename, 'rt') as f:
+            lines = f.read().splitlines()
+        for line in lines:
             if line.startswith('uniform '):
                 uniforms.append(line)
             elif line.startswith('attribute '):
@@ -152,85 +168,95 @@ class Shader():
             q,t,n = m['qualifier'],m['type'],m['name']
             locate = bgl.glGetAttribLocation if q in {'in','attribute'} else bgl.glGetUniformLocation
             if n in self.shaderVars: continue
-            self.shaderVars[n] = {
-                'qualifier': q,
-                'type': t,
-                'location': locate(self.shaderProg, n),
-                'reported': False,
-                }
+            loc = locate(self.shaderProg, n)
+            self.shaderVars[n] = ShaderVar(q, t, loc, self.create_setter(n, q, t, loc))
 
-        dprint('  attribs: ' + ', '.join((k + ' (%d)'%self.shaderVars[k]['location']) for k in self.shaderVars if self.shaderVars[k]['qualifier'] in {'in','attribute'}))
-        dprint('  uniforms: ' + ', '.join((k + ' (%d)'%self.shaderVars[k]['location']) for k in self.shaderVars if self.shaderVars[k]['qualifier'] in {'uniform'}))
+        dprint('  attribs: ' + ', '.join((k + ' (%d)'%self.shaderVars[k].location) for k in self.shaderVars if self.shaderVars[k].qualifier in {'in','attribute'}))
+        dprint('  uniforms: ' + ', '.join((k + ' (%d)'%self.shaderVars[k].location) for k in self.shaderVars if self.shaderVars[k].qualifier in {'uniform'}))
 
         self.funcStart = funcStart
         self.funcEnd = funcEnd
         self.mvpmatrix_buffer = bgl.Buffer(bgl.GL_FLOAT, [4,4])
 
+        # last values pushed to scalar/vector uniforms while shader is enabled.
+        # None when disabled, so assign() never skips a call that ends up compiled
+        # into a display list (see BMeshRender.clean)
+        self.uniform_cache = None
+
     def __setitem__(self, varName, varValue): self.assign(varName, varValue)
 
     def assign_buffer(self, varName, varValue):
         return self.assign(varName, bgl.Buffer(bgl.GL_FLOAT, [4,4], varValue))
 
+    uniform_cacheable = {'float', 'vec2', 'vec3', 'vec4'}
+
+    @staticmethod
+    def create_setter(n, q, t, l):
+        '''
+        builds the bgl call for a variable once, so assign() does not need to
+        dispatch on qualifier and type every time it is called
+        '''
+        if q in {'in','attribute'}:
+            if t == 'float': return lambda v: bgl.glVertexAttrib1f(l, v)
+            if t == 'int':   return lambda v: bgl.glVertexAttrib1i(l, v)
+            if t == 'vec2':  return lambda v: bgl.glVertexAttrib2f(l, *v)
+            if t == 'vec3':  return lambda v: bgl.glVertexAttrib3f(l, *v)
+            if t == 'vec4':  return lambda v: bgl.glVertexAttrib4f(l, *v)
+            msg = 'Unhandled type %s for attrib %s' % (t, n)
+        elif q in {'uniform'}:
+            # cannot set bools with BGL! :(
+            if t == 'float': return lambda v: bgl.glUniform1f(l, v)
+            if t == 'vec2':  return lambda v: bgl.glUniform2f(l, *v)
+            if t == 'vec3':  return lambda v: bgl.glUniform3f(l, *v)
+            if t == 'vec4':  return lambda v: bgl.glUniform4f(l, *v)
+            if t == 'mat3':  return lambda v: bgl.glUniformMatrix3fv(l, 1, bgl.GL_TRUE, v)
+            if t == 'mat4':  return lambda v: bgl.glUniformMatrix4fv(l, 1, bgl.GL_TRUE, v)
+            msg = 'Unhandled type %s for uniform %s' % (t, n)
+        else:
+            msg = 'Unhandled qualifier %s for variable %s' % (q, n)
+        def unhandled(v): assert False, msg
+        return unhandled
+
     # https://www.opengl.org/sdk/docs/man/html/glVertexAttrib.xhtml
     # https://www.khronos.org/opengles/sdk/docs/man/xhtml/glUniform.xml
     def assign(self, varName, varValue):
         assert varName in self.shaderVars, 'Variable %s not found' % varName
         try:
             v = self.shaderVars[varName]
-            q,l,t = v['qualifier'],v['location'],v['type']
+            q,l,t = v.qualifier,v.location,v.type
             if l == -1:
-                if not v['reported']:
+                if not v.reported:
                     dprint('ASSIGNING TO UNUSED ATTRIBUTE (%s): %s = %s' % (self.name, varName,str(varValue)))
-                    v['reported'] = True
+                    v.reported = True
                 return
             if DEBUG_PRINT:
                 print('%s (%s,%d,%s) = %s' % (varName, q, l, t, str(varValue)))
-            if q in {'in','attribute'}:
-                if t == 'float':
-                    bgl.glVertexAttrib1f(l, varValue)
-                elif t == 'int':
-                    bgl.glVertexAttrib1i(l, varValue)
-                elif t == 'vec2':
-                    bgl.glVertexAttrib2f(l, *varValue)
-                elif t == 'vec3':
-                    bgl.glVertexAttrib3f(l, *varValue)
-                elif t == 'vec4':
-                    bgl.glVertexAttrib4f(l, *varValue)
-                else:
-                    assert False, 'Unhandled type %s for attrib %s' % (t, varName)
-                if self.checkErrors:
-                    self.drawing.glCheckError('assign attrib %s = %s' % (varName, str(varValue)))
-            elif q in {'uniform'}:
-                # cannot set bools with BGL! :(
-                if t == 'float':
-                    bgl.glUniform1f(l, varValue)
-                elif t == 'vec2':
-                    bgl.glUniform2f(l, *varValue)
-                elif t == 'vec3':
-                    bgl.glUniform3f(l, *varValue)
-                elif t == 'vec4':
-                    bgl.glUniform4f(l, *varValue)
-                elif t == 'mat3':
-                    bgl.glUniformMatrix3fv(l, 1, bgl.GL_TRUE, varValue)
-                elif t == 'mat4':
-                    bgl.glUniformMatrix4fv(l, 1, bgl.GL_TRUE, varValue)
-                else:
-                    assert False, 'Unhandled type %s for uniform %s' % (t, varName)
+            if q == 'uniform':
+                cache = self.uniform_cache
+                if cache is not None and t in self.uniform_cacheable:
+                    # uniforms keep their value in the program, so only push changes
+                    cv = varValue if t == 'float' else tuple(varValue)
+                    if cache.get(varName) == cv: return
+                    cache[varName] = cv
+                v.setter(varValue)
                 if self.checkErrors:
                     self.drawing.glCheckError('assign uniform %s (%s %d) = %s' % (varName, t, l, str(varValue)))
             else:
-                assert False, 'Unhandled qualifier %s for variable %s' % (q, varName)
+                v.setter(varValue)
+                if self.checkErrors:
+                    self.drawing.glCheckError('assign attrib %s = %s' % (varName, str(varValue)))
         except Exception as e:
+            if self.uniform_cache: self.uniform_cache.pop(varName, None)
             print('ERROR (assign): ' + str(e))
 
     def enableVertexAttribArray(self, varName):
         assert varName in self.shaderVars, 'Variable %s not found' % varName
         v = self.shaderVars[varName]
-        q,l,t = v['qualifier'],v['location'],v['type']
+        q,l,t = v.qualifier,v.location,v.type
         if l == -1:
-            if not v['reported']:
+            if not v.reported:
                 print('COULD NOT FIND %s' % (varName))
-                v['reported'] = True
+                v.reported = True
             return
         if DEBUG_PRINT:
             print('enable vertattrib array: %s (%s,%d,%s)' % (varName, q, l, t))
@@ -248,11 +274,11 @@ class Shader():
     def vertexAttribPointer(self, vbo, varName, size, gltype, normalized=bgl.GL_FALSE, stride=0, buf=buf_zero, enable=True):
         assert varName in self.shaderVars, 'Variable %s not found' % varName
         v = self.shaderVars[varName]
-        q,l,t = v['qualifier'],v['location'],v['type']
+        q,l,t = v.qualifier,v.location,v.type
         if l == -1:
-            if not v['reported']:
+            if not v.reported:
                 print('COULD NOT FIND %s' % (varName))
-                v['reported'] = True
+                v.reported = True
             return
 
         if DEBUG_PRINT:
@@ -267,11 +293,11 @@ class Shader():
     def disableVertexAttribArray(self, varName):
         assert varName in self.shaderVars, 'Variable %s not found' % varName
         v = self.shaderVars[varName]
-        q,l,t = v['qualifier'],v['location'],v['type']
+        q,l,t = v.qualifier,v.location,v.type
         if l == -1:
-            if not v['reported']:
+            if not v.reported:
                 print('COULD NOT FIND %s' % (varName))
-                v['reported'] = True
+                v.reported = True
             return
         if DEBUG_PRINT:
             print('disable vertattrib array: %s (%s,%d,%s)' % (varName, q, l, t))
@@ -298,6 +324,7 @@ class Shader():
             bgl.glUseProgram(self.shaderProg)
             if self.checkErrors:
                 self.drawing.glCheckError('something broke after enabling shader program (%s,%d)' % (self.name,self.shaderProg))
+            self.uniform_cache = {}
 
             # special uniforms
             # - uMVPMatrix works around deprecated gl_ModelViewProjectionMatrix
@@ -310,6 +337,7 @@ class Shader():
         except Exception as e:
             print('Error with using shader: ' + str(e))
             bgl.glUseProgram(0)
+            self.uniform_cache = None
 
     def disable(self):
         if DEBUG_PRINT:
@@ -321,6 +349,7 @@ class Shader():
         except Exception as e:
             print('Error with shader: ' + str(e))
         bgl.glUseProgram(0)
+        self.uniform_cache = None
         if self.checkErrors:
             self.drawing.glCheckError('something broke after disabling shader program (%s,%d)' % (self.name, self.shaderProg))
 
@@ -39,6 +39,7 @@ from .decorators import blender_version_wrapper
 from .maths import Point2D, Vec2D, clamp, mid
 from .profiler import profiler
 from .drawing import Drawing, ScissorStack
+from .fontmanager import FontManager as fm
 
 from ..ext import png
 
@@ -71,7 +72,56 @@ def load_image_png(fn):
     return load_image_png.cache[fn]
 
 
+@functools.lru_cache(maxsize=1024)
+def wrap_text(drawing, text, mwidth, fontsize_scaled, fontid):
+    '''
+    wraps text to mwidth using drawing's current font and font size.
+    fontsize_scaled and fontid are not used directly, but the cache key must cover
+    every input that affects text metrics.
+    returns (wrapped_lines, (width, height)); returned list is shared, do not modify
+    '''
+    twidth = drawing.get_text_width
+    def wrap(t):
+        words = t.split(' ')
+        words.reverse()
+        lines = []
+        line = []
+        while words:
+            word = words.pop()
+            nline = line + [word]
+            if line and twidth(' '.join(nline)) >= mwidth:
+                lines.append(' '.join(line))
+                line = [word]
+            else:
+                line = nline
+        lines.append(' '.join(line))
+        return lines
+    lines = text.split('\n')
+    wrapped_lines = [wrapped_line for line in lines for wrapped_line in wrap(line)]
+    w = twidth(wrapped_lines) #max(twidth(l) for l in wrapped_lines)
+    h = drawing.get_line_height(wrapped_lines)
+    return (wrapped_lines, (w, h))
+
+
+@functools.lru_cache(maxsize=256)
+def process_wrapped_label(label):
+    # process message similarly to Markdown
+    label = label.strip('\n')                           # remove leading and trailing \n
+    label = re.sub(r'\n\n\n*', r'\n\n', label)          # 2+ \n => \n\n
+    paras = label.split('\n\n')                         # split into paragraphs
+    paras = [p.replace('\n', '  ') for p in paras]      # join sentences of paragraphs
+    return '\n\n'.join(paras)                           # join paragraphs
+
+
+@functools.lru_cache(maxsize=None)
+def recalc_size_profile_text(cls):
+    # profiler label for recalc_size, built once per class instead of every call
+    return 'UI_Element: calling _recalc_size on %s' % str(cls)
+
+
 class GetSet:
+    __slots__ = ['fn_get', 'fn_set']
+
     def __init__(self, fn_get, fn_set):
         self.fn_get = fn_get
         self.fn_set = fn_set
@@ -80,6 +130,8 @@ class GetSet:
 
 
 class UI_Event:
+    __slots__ = ['type', 'value']
+
     def __init__(self, type, value):
         self.type = type
         self.value = value
@@ -90,6 +142,9 @@ class UI_Element:
         self.is_dirty = True
         self.dirty_callbacks = []
         self.defer_recalc = False
+        self.defer_dirty_propagation = False
+        self._margins_scaled = None
+        self._draw_box = None
 
         self.drawing = Drawing.get_instance()
         self.context = bpy.context
@@ -236,9 +291,19 @@ class UI_Element:
         # print('Marking %s as dirty' % type(self))
         # if type(self) is UI_Label: print('  %s' % self.text)
         self.is_dirty = True
+        self._margins_scaled = None
+        if self.defer_dirty_propagation: return
         for ui_item in self.dirty_callbacks:
             ui_item.dirty()
 
+    def get_margins_scaled(self):
+        # (left, right, top, bottom) margins in pixels, cached until next dirty() or dpi change
+        dpi_mult = self.drawing.get_dpi_mult()
+        if not self._margins_scaled or self._margins_scaled[0] != dpi_mult:
+            scale = self.drawing.scale
+            self._margins_scaled = (dpi_mult, (scale(self._margin_left), scale(self._margin_right), scale(self._margin_top), scale(self._margin_bottom)))
+        return self._margins_scaled[1]
+
     def delete(self):
         self.deleted = True
         self._delete()
@@ -270,15 +335,16 @@ class UI_Element:
             self.last_dpi = self.drawing.get_dpi_mult()
             self.dirty()
 
-        ml = self.drawing.scale(self._margin_left)
-        mr = self.drawing.scale(self._margin_right)
-        mt = self.drawing.scale(self._margin_top)
-        mb = self.drawing.scale(self._margin_bottom)
+        ml,mr,mt,mb = self.get_margins_scaled()
 
-        self.pos = Point2D((left + ml, top - mt))
-        self.size = Vec2D((width - ml - mr, height - mt - mb))
-        self.pos0 = Point2D((left, top))
-        self.size0 = Vec2D((width, height))
+        # reuse last frame's pos/size objects unless the box changed or someone replaced them
+        box = (left, top, width, height, ml, mr, mt, mb)
+        if not self._draw_box or self._draw_box[0] != box or self._draw_box[1] is not self.pos or self._draw_box[2] is not self.size:
+            self.pos = Point2D((left + ml, top - mt))
+            self.size = Vec2D((width - ml - mr, height - mt - mb))
+            self.pos0 = Point2D((left, top))
+            self.size0 = Vec2D((width, height))
+            self._draw_box = (box, self.pos, self.size)
         self.clip = ScissorStack.get_current_view()
 
         if debug_draw:
@@ -324,7 +390,7 @@ class UI_Element:
         self._width_inner, self._height_inner = 0, 0
         if not self.visible: return (self._width, self._height)
 
-        pr = profiler.start('UI_Element: calling _recalc_size on %s' % str(type(self)))
+        pr = profiler.start(recalc_size_profile_text(type(self)))
         self._recalc_size()
 
         self._width_inner = max(self._min_size.x, self._width_inner)
@@ -336,8 +402,9 @@ class UI_Element:
         pr.done()
         if self._width_inner <= 0 or self._height_inner <= 0:
             return (self._width, self._height)
-        self._width = self._width_inner + self.drawing.scale(self._margin_left + self._margin_right)
-        self._height = self._height_inner + self.drawing.scale(self._margin_top + self._margin_bottom)
+        ml,mr,mt,mb = self.get_margins_scaled()
+        self._width = self._width_inner + ml + mr
+        self._height = self._height_inner + mt + mb
 
         self.is_dirty = False
         return (self._width, self._height)
@@ -767,6 +834,17 @@ class UI_Container(UI_Element):
         self.dirty()
         return ui_item
 
+    def add_items(self, ui_items):
+        # calls add for each item, but propagates dirtiness to parents only once
+        prev = self.defer_dirty_propagation
+        self.defer_dirty_propagation = True
+        try:
+            ui_items = [self.add(ui_item) for ui_item in ui_items]
+        finally:
+            self.defer_dirty_propagation = prev
+        if ui_items: self.dirty()
+        return ui_items
+
     def clear(self):
         for ui_item in self.ui_items:
             ui_item.unregister_dirty_callback(self)
@@ -790,7 +868,8 @@ class UI_Container(UI_Element):
         return self
 
     def _recalc_size(self):
-        sizes = [ui_item.recalc_size() for ui_item in self.ui_items if ui_item.visible]
+        # clean items already hold their size; skip the (profiled) recalc_size call
+        sizes = [ui_item.recalc_size() if ui_item.is_dirty else (ui_item._width, ui_item._height) for ui_item in self.ui_items if ui_item.visible]
         #sizes = [sz for (sz,ui_item) in zip(sizes, self.ui_items) if ui_item.visible]
         sizes = [(w,h) for (w,h) in sizes if w > 0 and h > 0]
         widths = [w for (w,h) in sizes]
@@ -1040,15 +1119,7 @@ class UI_WrappedLabel(UI_Element):
     def set_bgcolor(self, bgcolor): self.bgcolor = bgcolor
 
     def set_label(self, label):
-        # process message similarly to Markdown
-        label = str(label)
-        label = re.sub(r'^\n*', r'', label)                 # remove leading \n
-        label = re.sub(r'\n*$', r'', label)                 # remove trailing \n
-        label = re.sub(r'\n\n\n*', r'\n\n', label)          # 2+ \n => \n\n
-        paras = label.split('\n\n')                         # split into paragraphs
-        paras = [re.sub(r'\n', '  ', p) for p in paras]     # join sentences of paragraphs
-        label = '\n\n'.join(paras)                          # join paragraphs
-
+        label = process_wrapped_label(str(label))
         if self.text == label: return
 
         self.text = label
@@ -1058,31 +1129,8 @@ class UI_WrappedLabel(UI_Element):
         # TODO: move code below to _recalc_size?
 
         size_prev = self.drawing.set_font_size(self.fontsize)
-        mwidth = self.size.x
-        twidth = self.drawing.get_text_width
-        swidth = twidth(' ')
-        wrapped = []
-        def wrap(t):
-            words = t.split(' ')
-            words.reverse()
-            lines = []
-            line = []
-            while words:
-                word = words.pop()
-                nline = line + [word]
-                if line and twidth(' '.join(nline)) >= mwidth:
-                    lines.append(' '.join(line))
-                    line = [word]
-                else:
-                    line = nline
-            lines.append(' '.join(line))
-            return lines
-        lines = self.text.split('\n')
-        self.wrapped_lines = [wrapped_line for line in lines for wrapped_line in wrap(line)]
-        w = twidth(self.wrapped_lines) #max(twidth(l) for l in self.wrapped_lines)
-        h = self.drawing.get_line_height(self.wrapped_lines)
+        self.wrapped_lines,(w,h) = wrap_text(self.drawing, self.text, self.size.x, self.drawing.fontsize_scaled, fm.load(None))
         self.wrapped_size = Vec2D((w, h))
-
         self.drawing.set_font_size(size_prev)
 
     def _recalc_size(self):
@@ -1134,8 +1182,7 @@ class UI_Markdown(UI_Padding):
 
     def set_markdown(self, mdown):
         # process message similarly to Markdown
-        mdown = re.sub(r'^\n*', r'', mdown)                 # remove leading \n
-        mdown = re.sub(r'\n*$', r'', mdown)                 # remove trailing \n
+        mdown = mdown.strip('\n')                           # remove leading and trailing \n
         mdown = re.sub(r'\n\n\n*', r'\n\n', mdown)          # 2+ \n => \n\n
 
         if mdown == self._markdown: return
@@ -1148,15 +1195,19 @@ class UI_Markdown(UI_Padding):
             if p.startswith('# '):
                 # h1 heading!
                 h1text = re.sub(r'# +', r'', p)
-                container.add(UI_Spacer(height=4))
-                h1 = container.add(UI_WrappedLabel(h1text, fontsize=20, shadowcolor=(0,0,0,0.5)))
-                container.add(UI_Spacer(height=14))
+                container.add_items([
+                    UI_Spacer(height=4),
+                    UI_WrappedLabel(h1text, fontsize=20, shadowcolor=(0,0,0,0.5)),
+                    UI_Spacer(height=14),
+                ])
             elif p.startswith('## '):
                 # h2 heading!
                 h2text = re.sub(r'## +', r'', p)
-                container.add(UI_Spacer(height=8))
-                h2 = container.add(UI_WrappedLabel(h2text, fontsize=16, shadowcolor=(0,0,0,0.5)))
-                container.add(UI_Spacer(height=4))
+                container.add_items([
+                    UI_Spacer(height=8),
+                    UI_WrappedLabel(h2text, fontsize=16, shadowcolor=(0,0,0,0.5)),
+                    UI_Spacer(height=4),
+                ])
             elif p.startswith('- '):
                 # unordered list!
                 ul = container.add(UI_Container())
@@ -1186,7 +1237,7 @@ class UI_Markdown(UI_Padding):
                         else:
                             t.set(r, c, UI_WrappedLabel(data[r][c], min_size=(0, 12), max_size=(400, 12000)))
             else:
-                p = re.sub(r'\n', '  ', p)      # join sentences of paragraph
+                p = p.replace('\n', '  ')      # join sentences of paragraph
                 container.add(UI_WrappedLabel(p, max_size=self.max_size))
         self.set_ui_item(container)
 
@@ -1376,7 +1427,7 @@ class UI_Options(UI_Container):
         if self.mouse_prev != mouse:
             self.mouse_prev = mouse
             ui_hover = self.container._hover_ui(mouse)
-            for ui in self.container.get_ui_items():
+            for ui in self.container.ui_items:
                 if ui == ui_hover:
                     ui.mouse_enter()
                 else:
@@ -1394,7 +1445,7 @@ class UI_Options(UI_Container):
         self.set_option(self.options[ui])
 
     def mouse_leave(self):
-        for ui in self.container.get_ui_items():
+        for ui in self.container.ui_items:
             ui.mouse_leave()
 
     @profiler.profile